@@ -127,3 +127,17 @@ def test_gen_constraints(input_a, input_b, at_least, allows):
     assert c.allows[2] == allows[2]
     assert c.allows[3] == allows[3]
     assert c.allows[4] == allows[4]
+
+
+@pytest.mark.parametrize(
+    "input_a,input_b,clues",
+    [("shire", "cross", "_c-r_o-s_s"), ("adage", "adiue", "+a+d_i_u+e")],
+)
+def test_feedback(input_a, input_b, clues):
+    assert Constraint.feedback(input_a, input_b) == clues
+
+
+def test_score_class_collapses_renamed_letters():
+    assert Constraint.scoreClass("+s_a-s_s_y") == "+a_b-a_a_c"
+    assert Constraint.scoreClass("+t_o-t_t_e") == "+a_b-a_a_c"
+    assert Constraint.fromString("+s_a-s_s_y").score() == Constraint.fromString("+t_o-t_t_e").score()
@@ -0,0 +1,272 @@
+#!python3
+
+from __future__ import annotations
+
+import argparse
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener, address_type
+import os
+import queue
+import socket
+import sys
+import threading
+from typing import Dict, List, Tuple
+
+from wordle_model import CharMode, Constraint, GameModel, WordDictionary
+
+# Batch evaluation of openers, spread over any number of worker processes.
+# The coordinator listens on a TCP or Unix socket and hands out work units,
+# each an opener and a slice of answers; workers connect, evaluate units and
+# send back partial totals. A unit whose worker disconnects or reports an
+# error goes back on the queue for the next worker, up to max_attempts tries,
+# after which all of its answers count as failures.
+#
+# Units and results are pickled, so anyone holding the authkey can run code
+# on the coordinator and the workers. There is no default key: pass
+# --authkey-file or set WORDLE_BATCH_AUTHKEY, and don't expose the port
+# beyond machines you trust.
+#
+#   export WORDLE_BATCH_AUTHKEY=$(head -c 32 /dev/urandom | base64)
+#   ./wordle_batch.py coordinator --address 0.0.0.0:6000 --openers adieu,crane
+#   ./wordle_batch.py worker --address coordinator-host:6000
+
+
+class WorkUnit:
+    unit_id: int
+    kind: str
+    opener: str
+    answers: List[str]
+
+    def __init__(self, unit_id=0, kind="score", opener=None, answers=None):
+        self.unit_id = unit_id
+        self.kind = kind
+        self.opener = opener
+        self.answers = answers if answers else []
+
+
+def makeWorkUnits(openers: List[str], answers: List[str], kind: str = "score", slice_size: int = 100) -> List[WorkUnit]:
+    units = []
+    for opener in openers:
+        for start in range(0, len(answers), slice_size):
+            units.append(WorkUnit(len(units), kind, opener, answers[start:start + slice_size]))
+    return units
+
+
+def solve(answer: str, opener: str, word_list: List[str], class_scores: Dict[str, float], max_turns: int = 6) -> int:
+    """
+    play one game against answer, always taking the top recommendation.
+    returns the number of turns used, or None if it ran out of turns.
+    """
+    model = GameModel(word_list=word_list, favorites_list=[], use_pool=False, exact_score_limit=len(word_list), speculate=False)
+    model.class_scores = class_scores
+    guess = opener
+    for turn in range(1, max_turns + 1):
+        if guess == answer:
+            return turn
+        model.addWord(guess)
+        clues = Constraint.feedback(answer, guess)
+        model.colors[-1] = list(map(lambda pos: CharMode(clues[pos]), range(0, 10, 2)))
+        model.processColors()
+        recommendations = model.getRecommendations()
+        if not recommendations:
+            return None
+        guess = recommendations[0]
+    return None
+
+
+def evaluateUnit(unit: WorkUnit, model: GameModel) -> Tuple[float, int, int]:
+    """
+    (total, count, failures) for one unit. "score" units total the
+    opener's score against each answer, "solve" units total the turns
+    needed to solve each answer starting from the opener.
+    """
+    if unit.kind == "score":
+        return sum(map(lambda answer: model.scorePair(answer, unit.opener), unit.answers)), len(unit.answers), 0
+    if unit.kind == "solve":
+        turns = list(map(lambda answer: solve(answer, unit.opener, model.allowed_word_list, model.class_scores), unit.answers))
+        solved = list(filter(lambda turn: turn is not None, turns))
+        return sum(solved), len(solved), len(turns) - len(solved)
+    raise ValueError(f"unknown work unit kind: {unit.kind}")
+
+
+def mergeResults(units: List[WorkUnit], results: Dict[int, Tuple[float, int, int]]) -> Dict[str, Tuple[float, int, int]]:
+    merged = {}
+    for unit in units:
+        total, count, failures = merged.get(unit.opener, (0, 0, 0))
+        unit_total, unit_count, unit_failures = results[unit.unit_id]
+        merged[unit.opener] = (total + unit_total, count + unit_count, failures + unit_failures)
+    return merged
+
+
+class BatchCoordinator:
+    def __init__(self, address, units: List[WorkUnit], authkey: bytes, unit_timeout: float = None, max_attempts: int = 3) -> None:
+        self.address = address
+        self.attempts = {}
+        self.authkey = authkey
+        self.done = threading.Event()
+        self.errors = {}
+        self.lock = threading.Lock()
+        self.max_attempts = max_attempts
+        self.pending = queue.Queue()
+        self.results = {}
+        self.unit_timeout = unit_timeout
+        self.units = units
+        for unit in units:
+            self.pending.put(unit)
+        # bind now so workers can connect before run() is called
+        self.listener = Listener(address, authkey=authkey)
+
+    def serveWorker(self, conn) -> None:
+        try:
+            while not self.done.is_set():
+                try:
+                    unit = self.pending.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                with self.lock:
+                    self.attempts[unit.unit_id] = self.attempts.get(unit.unit_id, 0) + 1
+                try:
+                    conn.send(unit)
+                    if not conn.poll(self.unit_timeout):
+                        raise TimeoutError(f"work unit {unit.unit_id} timed out")
+                    unit_id, result, error = conn.recv()
+                except (EOFError, OSError) as e:
+                    # worker died or hung, someone else gets the unit
+                    self.unitFailed(unit, f"{type(e).__name__}: {e}")
+                    return
+                if error is not None:
+                    self.unitFailed(unit, error)
+                    continue
+                self.storeResult(unit_id, result)
+            conn.send(None)
+        except (EOFError, OSError):
+            pass
+        finally:
+            conn.close()
+
+    def storeResult(self, unit_id: int, result: Tuple[float, int, int]) -> None:
+        with self.lock:
+            self.results[unit_id] = result
+            if len(self.results) == len(self.units):
+                self.done.set()
+
+    def unitFailed(self, unit: WorkUnit, error: str) -> None:
+        """
+        requeue unit, or after max_attempts tries give up on it and count
+        every answer in it as a failure.
+        """
+        with self.lock:
+            self.errors[unit.unit_id] = error
+            give_up = self.attempts[unit.unit_id] >= self.max_attempts
+        if give_up:
+            self.storeResult(unit.unit_id, (0, 0, len(unit.answers)))
+        else:
+            self.pending.put(unit)
+
+    def acceptWorkers(self) -> None:
+        while not self.done.is_set():
+            try:
+                conn = self.listener.accept()
+            except (AuthenticationError, EOFError, OSError):
+                # a client with the wrong key, or one that hung up
+                continue
+            if self.done.is_set():
+                conn.close()
+                break
+            threading.Thread(target=self.serveWorker, args=(conn,), daemon=True).start()
+
+    def run(self) -> Dict[str, Tuple[float, int, int]]:
+        """
+        hand out units until every one has a result, then merge them
+        per opener. the last error of every unit that failed at least
+        once is left in errors.
+        """
+        if not self.units:
+            self.listener.close()
+            return {}
+        accepter = threading.Thread(target=self.acceptWorkers, daemon=True)
+        accepter.start()
+        self.done.wait()
+        # wake the accept loop so it sees we're done. a bare connect fails
+        # its handshake instead of waiting on it, so this can't hang if the
+        # loop has already stopped
+        try:
+            with socket.socket(getattr(socket, address_type(self.listener.address))) as wake:
+                wake.connect(self.listener.address)
+        except OSError:
+            pass
+        accepter.join()
+        self.listener.close()
+        return mergeResults(self.units, self.results)
+
+
+def runWorker(address, authkey: bytes, word_list: List[str] = None) -> int:
+    """
+    evaluate units from the coordinator at address until it says stop.
+    returns how many units this worker finished.
+    """
+    model = GameModel(word_list=word_list, favorites_list=[], use_pool=False, speculate=False)
+    finished = 0
+    with Client(address, authkey=authkey) as conn:
+        while True:
+            try:
+                unit = conn.recv()
+            except EOFError:
+                break
+            if unit is None:
+                break
+            try:
+                conn.send((unit.unit_id, evaluateUnit(unit, model), None))
+            except Exception as e:
+                conn.send((unit.unit_id, None, f"{type(e).__name__}: {e}"))
+                continue
+            finished += 1
+    return finished
+
+
+def parseAddress(text: str):
+    host, sep, port = text.rpartition(":")
+    if sep and port.isdigit():
+        return host, int(port)
+    return text
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Evaluate wordle openers across worker processes.")
+    parser.add_argument("role", choices=["coordinator", "worker"])
+    parser.add_argument("--address", required=True, help="host:port, or a path for a unix socket")
+    parser.add_argument("--authkey-file", help="file holding the shared key, instead of $WORDLE_BATCH_AUTHKEY")
+    parser.add_argument("--openers", default="", help="comma separated openers to evaluate")
+    parser.add_argument("--kind", choices=["score", "solve"], default="score")
+    parser.add_argument("--slice-size", type=int, default=100)
+    parser.add_argument("--unit-timeout", type=float, default=None)
+    args = parser.parse_args(argv)
+
+    address = parseAddress(args.address)
+    if args.authkey_file:
+        authkey = open(args.authkey_file, "rb").read().strip()
+    else:
+        authkey = os.environ.get("WORDLE_BATCH_AUTHKEY", "").encode()
+    if not authkey:
+        parser.error("a shared key is required, use --authkey-file or set WORDLE_BATCH_AUTHKEY")
+    if args.role == "worker":
+        runWorker(address, authkey)
+        return
+
+    answers = sorted(set(map(lambda x: x.strip().lower(), open("words.txt", "r"))))
+    openers = list(filter(None, map(str.strip, args.openers.lower().split(","))))
+    bad = list(filter(lambda opener: not WordDictionary.isWord(opener), openers))
+    if bad:
+        parser.error(f"openers must be five letter words: {', '.join(bad)}")
+    units = makeWorkUnits(openers, answers, args.kind, args.slice_size)
+    coordinator = BatchCoordinator(address, units, authkey, args.unit_timeout)
+    merged = coordinator.run()
+    for unit_id, error in sorted(coordinator.errors.items()):
+        print(f"unit {unit_id} ({units[unit_id].opener}) failed: {error}", file=sys.stderr)
+    for opener, (total, count, failures) in merged.items():
+        average = total / count if count else 0.0
+        print(f"{opener}\t{average:.4f}\t{count}\t{failures}")
+
+
+if __name__ == "__main__":
+    main()
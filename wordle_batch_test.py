@@ -0,0 +1,112 @@
+#!python3
+
+from multiprocessing import AuthenticationError, Process
+from multiprocessing.connection import Client
+import os
+import tempfile
+import threading
+import unittest
+from wordle_batch import BatchCoordinator, WorkUnit, evaluateUnit, main, makeWorkUnits, mergeResults, parseAddress, runWorker, solve
+from wordle_model import GameModel
+
+word_list = ["brand", "adieu", "candy", "crane", "sooty", "silly", "booty", "brine"]
+
+
+def crashingWorker(address):
+    # takes a unit and dies without answering
+    conn = Client(address, authkey=b"wordle")
+    conn.recv()
+    os._exit(1)
+
+
+class testWordleBatch(unittest.TestCase):
+
+    def local_results(self, units):
+        model = GameModel(word_list=word_list, favorites_list=[], use_pool=False, speculate=False)
+        return mergeResults(units, {unit.unit_id: evaluateUnit(unit, model) for unit in units})
+
+    def test_make_work_units_slices_answers(self):
+        units = makeWorkUnits(["adieu", "crane"], word_list, slice_size=3)
+        self.assertEqual(len(units), 6)
+        self.assertEqual(list(map(lambda unit: unit.unit_id, units)), list(range(6)))
+        self.assertEqual(units[2].answers, ["booty", "brine"])
+        self.assertEqual(units[3].opener, "crane")
+
+    def test_score_unit_averages_like_the_model(self):
+        model = GameModel(word_list=word_list, favorites_list=[], use_pool=False, speculate=False)
+        total, count, failures = evaluateUnit(WorkUnit(0, "score", "crane", word_list), model)
+        self.assertAlmostEqual(total / count, model.getScoreForGuess(("crane", word_list))[1])
+        self.assertEqual(failures, 0)
+
+    def test_solve_finds_the_answer(self):
+        self.assertEqual(solve("crane", "crane", word_list, {}), 1)
+        self.assertIsNotNone(solve("booty", "crane", word_list, {}))
+
+    def test_main_requires_a_key(self):
+        os.environ.pop("WORDLE_BATCH_AUTHKEY", None)
+        with self.assertRaises(SystemExit):
+            main(["worker", "--address", "localhost:6000"])
+
+    def test_main_rejects_bad_openers(self):
+        os.environ["WORDLE_BATCH_AUTHKEY"] = "wordle"
+        try:
+            with self.assertRaises(SystemExit):
+                main(["coordinator", "--address", "localhost:6000", "--openers", "crane,foo"])
+        finally:
+            os.environ.pop("WORDLE_BATCH_AUTHKEY", None)
+
+    def test_parse_address(self):
+        self.assertEqual(parseAddress("localhost:6000"), ("localhost", 6000))
+        self.assertEqual(parseAddress("/tmp/wordle.sock"), "/tmp/wordle.sock")
+
+    def test_workers_share_units_and_failed_units_are_reassigned(self):
+        units = makeWorkUnits(["adieu", "crane", "sooty"], word_list, kind="solve", slice_size=2)
+        with tempfile.TemporaryDirectory() as tmp:
+            address = os.path.join(tmp, "coordinator.sock")
+            coordinator = BatchCoordinator(address, units, b"wordle", unit_timeout=30)
+            merged = {}
+            runner = threading.Thread(target=lambda: merged.update(coordinator.run()))
+            runner.start()
+
+            # a client with the wrong key doesn't stop the coordinator accepting
+            self.assertRaises(AuthenticationError, Client, address, authkey=b"wrong")
+
+            crasher = Process(target=crashingWorker, args=(address,))
+            crasher.start()
+            crasher.join()
+            workers = [Process(target=runWorker, args=(address, b"wordle", word_list)) for _ in range(3)]
+            for worker in workers:
+                worker.start()
+            runner.join(60)
+            for worker in workers:
+                worker.join(10)
+
+        self.assertFalse(runner.is_alive())
+        self.assertEqual(merged, self.local_results(units))
+        self.assertEqual(list(map(lambda worker: worker.exitcode, workers)), [0, 0, 0])
+
+    def test_units_that_always_fail_are_given_up_on(self):
+        units = [WorkUnit(0, "score", "crane", word_list[:4]), WorkUnit(1, "bogus", "crane", word_list[4:])]
+        with tempfile.TemporaryDirectory() as tmp:
+            address = os.path.join(tmp, "coordinator.sock")
+            coordinator = BatchCoordinator(address, units, b"wordle", unit_timeout=30, max_attempts=2)
+            merged = {}
+            runner = threading.Thread(target=lambda: merged.update(coordinator.run()))
+            runner.start()
+            workers = [Process(target=runWorker, args=(address, b"wordle", word_list)) for _ in range(2)]
+            for worker in workers:
+                worker.start()
+            runner.join(60)
+            for worker in workers:
+                worker.join(10)
+
+        self.assertFalse(runner.is_alive())
+        self.assertEqual(coordinator.attempts[1], 2)
+        self.assertEqual(merged["crane"][1:], (4, 4))
+        self.assertIn("unknown work unit kind", coordinator.errors[1])
+        self.assertNotIn(0, coordinator.errors)
+        self.assertEqual(list(map(lambda worker: worker.exitcode, workers)), [0, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,11 +3,19 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod, abstractclassmethod
+from array import array
+from bisect import bisect_left
 from collections import Counter, defaultdict
 from enum import Enum
 import fileinput
-from typing import Dict, List, Set, Tuple
+import math
+import os
+import random
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
 from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
 
 class CharMode(Enum):
     absent = "_"
@@ -23,6 +31,18 @@ class Candidate:
         self.word = word
         self.score = score
 
+class GuessEvaluation:
+    word: str
+    score: float
+    buckets: Dict[str, int]
+    rank: int
+
+    def __init__(self, word=None, score=0.0, buckets=None, rank=0):
+        self.word = word
+        self.score = score
+        self.buckets = buckets if buckets else {}
+        self.rank = rank
+
 class ConstraintAbstract(ABC):
     @staticmethod
     @abstractmethod
@@ -44,6 +64,19 @@ class ConstraintAbstract(ABC):
     def diff(mystry, guess: str) -> ConstraintAbstract:
         return None
 
+    @staticmethod
+    @abstractmethod
+    def feedback(mystry, guess: str) -> str:
+        return None
+
+    @staticmethod
+    def scoreClass(clues: str) -> str:
+        """
+        key shared by every clue string whose diff has the same score.
+        by default only identical clue strings are known to match.
+        """
+        return clues
+
     @abstractmethod
     def __and__(self, othr):
         return self
@@ -132,6 +165,14 @@ class Constraint(ConstraintAbstract):
 
     @staticmethod
     def diff(mystry, guess: str) -> ConstraintAbstract:
+        return Constraint.fromString(Constraint.feedback(mystry, guess))
+
+    @staticmethod
+    def feedback(mystry, guess: str) -> str:
+        """
+        the clue string wordle would show for guess if the answer was
+        mystry, e.g. "+s_a-s_s_y".
+        """
         mguess = guess
         mapping = [-1, -1, -1, -1, -1]
         for pos in range(5):
@@ -152,11 +193,25 @@ class Constraint(ConstraintAbstract):
             if v != -1
         }
 
-        clues = "".join(
+        return "".join(
             [rmapping.get(pos, CharMode.absent).value + guess[pos] for pos in range(5)]
         )
 
-        return Constraint.fromString(clues)
+    @staticmethod
+    def scoreClass(clues: str) -> str:
+        """
+        the score only counts allowed letters per position, so renaming
+        letters doesn't change it. "+s_a-s_s_y" and "+t_o-t_t_e" both
+        become "+a_b-a_a_c".
+        """
+        names = {}
+        out = ""
+        for pos in range(0, 10, 2):
+            ltr = clues[pos + 1]
+            if ltr not in names:
+                names[ltr] = chr(97 + len(names))
+            out += clues[pos] + names[ltr]
+        return out
 
     def __and__(self, othr):
         return Constraint(
@@ -197,6 +252,121 @@ class Constraint(ConstraintAbstract):
         """
         return sum(map(lambda allow: 1 / len(allow), self.allows))
 
+class WordDictionary:
+    """
+    the allowed words plus a version number that goes up with every
+    change, and the list of (version, added, removed) deltas that got
+    it there.
+    """
+    deltas: List[Tuple[int, List[str], List[str]]]
+    version: int
+    words: List[str]
+
+    def __init__(self, words=None) -> None:
+        self.deltas = []
+        self.version = 0
+        self.words = list(words) if words else []
+        WordDictionary.checkWords(self.words)
+        self.word_set = set(self.words)
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.word_set
+
+    @staticmethod
+    def isWord(word: str) -> bool:
+        return len(word) == 5 and all(map(lambda ltr: "a" <= ltr <= "z", word))
+
+    @staticmethod
+    def checkWords(words: List[str]) -> None:
+        bad = list(filter(lambda word: not WordDictionary.isWord(word), words))
+        if bad:
+            raise ValueError(f"not five lowercase letters: {', '.join(map(repr, bad[:5]))}")
+
+    def __iter__(self):
+        return iter(self.words)
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def apply(self, added=(), removed=()) -> Tuple[List[str], List[str]]:
+        """
+        add and remove words, returning the ones that actually changed.
+        raises ValueError, changing nothing, if an added word isn't five
+        letters a-z.
+        """
+        added = list(map(str.lower, added))
+        WordDictionary.checkWords(added)
+        removed = list(filter(self.word_set.__contains__, dict.fromkeys(map(str.lower, removed))))
+        self.word_set.difference_update(removed)
+        added = list(filter(lambda word: word not in self.word_set, dict.fromkeys(added)))
+        self.word_set.update(added)
+        if removed:
+            self.words = list(filter(self.word_set.__contains__, self.words))
+        self.words.extend(added)
+        if added or removed:
+            self.version += 1
+            self.deltas.append((self.version, added, removed))
+        return added, removed
+
+class SharedWordTable:
+    """
+    words packed five bytes apiece into one shared memory block, plus a
+    block of indexes into them, so pool tasks carry a range instead of
+    a pickled model and candidate list each. this is not zero-copy:
+    scoring works on str, so each worker still decodes its own copy of
+    the candidates once when it attaches. use it as a context manager;
+    both blocks are unlinked on the way out, errors included. if the
+    whole process dies, multiprocessing's resource tracker unlinks them.
+    """
+    index_count: int
+    index_block: SharedMemory
+    words_block: SharedMemory
+
+    def __init__(self, words: List[str], indexes: List[int]) -> None:
+        self.index_count = len(indexes)
+        self.words_block = SharedMemory(create=True, size=max(1, 5 * len(words)))
+        self.index_block = None
+        try:
+            self.words_block.buf[:5 * len(words)] = "".join(words).encode("ascii")
+            self.index_block = SharedMemory(create=True, size=max(4, 4 * len(indexes)))
+            # the block can be bigger than asked for, only cast what's used
+            with self.index_block.buf[:4 * len(indexes)] as raw, raw.cast("I") as view:
+                view[:] = array("I", indexes)
+        except:
+            self.close()
+            raise
+
+    def __enter__(self) -> SharedWordTable:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for block in [self.words_block, self.index_block]:
+            if block is not None:
+                block.close()
+                block.unlink()
+        self.words_block = self.index_block = None
+
+    @staticmethod
+    def attach(words_name: str, index_name: str, index_count: int) -> List[str]:
+        """
+        a decoded copy of the indexed words, read from blocks another
+        process created. the blocks are closed again before returning.
+        """
+        words_block = index_block = None
+        try:
+            words_block = SharedMemory(name=words_name)
+            index_block = SharedMemory(name=index_name)
+            with index_block.buf[:4 * index_count] as raw, raw.cast("I") as view:
+                indexes = view.tolist()
+            return list(map(lambda i: bytes(words_block.buf[5 * i:5 * i + 5]).decode("ascii"), indexes))
+        finally:
+            for block in [words_block, index_block]:
+                if block is not None:
+                    block.close()
+
 class TurnPhase(Enum):
     word_entry = 0
     color_entry = 1
@@ -207,9 +377,13 @@ class GameStatus(Enum):
     over_failure = 2
 
 class GameModel:
+    candidates: List[str]
+    class_scores: Dict[str, float]
     colors: List[List[CharMode]]
     constraint_class: type
     constraints: ConstraintAbstract
+    dictionary: WordDictionary
+    evaluations: Dict[str, GuessEvaluation]
     favorites: List[str]
     phase: TurnPhase
     recommendations: List[Candidate]
@@ -217,10 +391,21 @@ class GameModel:
     turn_number: int
     use_pool: bool
     words: List[str]
-
-    def __init__(self, word_list:List[str] = None, favorites_list:List[str] = None, constraint_class:type = Constraint, constraint:ConstraintAbstract = None, use_pool:bool = True) -> None:
+    exact_score_limit: int
+    time_budget: float
+    seed: int
+    max_samples: int
+    speculate: bool
+    speculation_limit: int
+    speculations: Dict[str, Tuple[ConstraintAbstract, List[str], List[Tuple[str, float]]]]
+
+    def __init__(self, word_list:List[str] = None, favorites_list:List[str] = None, constraint_class:type = Constraint, constraint:ConstraintAbstract = None, use_pool:bool = True, exact_score_limit:int = 300, time_budget:float = 0.8, speculate:bool = True, speculation_limit:int = 8, seed:int = 0, max_samples:int = None) -> None:
+        self.candidates = None
+        self.class_scores = {}
         self.colors = []
         self.constraint_class = constraint_class
+        self.evaluations = {}
+        self.exact_score_limit = exact_score_limit
         if constraint is not None:
             self.constraints = constraint
         else:
@@ -233,13 +418,24 @@ class GameModel:
         self.phase = TurnPhase.word_entry
         self.recommendations = []
         self.processCandidates()
+        self.speculate = speculate
+        self.speculation = None
+        self.speculation_limit = speculation_limit
+        self.speculations = {}
         self.turn_number = -1
+        self.max_samples = max_samples
+        self.seed = seed
+        self.time_budget = time_budget
         self.use_pool = use_pool
         self.words = []
         if word_list is not None:
-            self.allowed_word_list = word_list
+            self.dictionary = WordDictionary(word_list)
         else:
-            self.allowed_word_list = set(map(lambda x: x.strip().lower(), open("words.txt", "r")))
+            self.dictionary = WordDictionary(set(map(lambda x: x.strip().lower(), open("words.txt", "r"))))
+
+    @property
+    def allowed_word_list(self) -> List[str]:
+        return self.dictionary.words
 
     def incrementTurn(self) -> None:
         self.turn_number += 1
@@ -252,18 +448,89 @@ class GameModel:
             CharMode.correct: CharMode.absent
         }.get(mode, CharMode.absent)
 
+    def scorePair(self, mystry: str, guess: str) -> float:
+        if guess == mystry:
+            return 0.0
+        # pairs whose feedback falls in the same score class share one diff
+        key = self.constraint_class.scoreClass(self.constraint_class.feedback(mystry, guess))
+        score = self.class_scores.get(key)
+        if score is None:
+            score = self.class_scores[key] = self.constraint_class.diff(mystry, guess).score()
+        return score
+
     def getScoreForGuess(self, guess_candidate_pair):
         guess, candidates = guess_candidate_pair
         # total_matched = 0
         # total_candidate = 0
         total = 0
         for mystry in candidates:
-            if guess == mystry:
-                continue
-            cons = self.constraint_class.diff(mystry, guess)
-            total += cons.score()
+            total += self.scorePair(mystry, guess)
         return guess, total / len(candidates)
 
+    def estimateScores(self, guesses: List[str], candidates: List[str], time_budget: float, top_k: int = 20, batch_size: int = 8, seed=None, cancel: threading.Event = None, max_samples: int = None) -> List[Tuple[str, float]]:
+        """
+        anytime version of getScoreForGuess for large candidate sets.
+        every guess is scored against the same shuffled sample of
+        candidates, the sample doubling each round. after each round only
+        the better half of the guesses whose 95% confidence interval
+        reaches the current top_k keep being refined. stops once time_budget seconds have passed,
+        every remaining contender has max_samples (or all) candidates
+        scored, or early when cancel is set.
+
+        the score returned for each guess is the lower end of its
+        interval, so a guess dropped after a few lucky samples doesn't
+        outrank the contenders that were refined further.
+        """
+        deadline = time.monotonic() + time_budget
+        # sorted first so the same seed gives the same sample whatever
+        # order the word list happened to load in
+        sample = sorted(candidates)
+        random.Random(seed).shuffle(sample)
+        limit = len(sample) if max_samples is None else min(max_samples, len(sample))
+        totals = dict.fromkeys(guesses, 0.0)
+        squares = dict.fromkeys(guesses, 0.0)
+        counts = dict.fromkeys(guesses, 0)
+        active = list(guesses)
+        while active and time.monotonic() < deadline:
+            if cancel is not None and cancel.is_set():
+                break
+            for guess in active:
+                start = counts[guess]
+                stop = min(max(start + batch_size, 2 * start), limit)
+                for mystry in sample[start:stop]:
+                    value = self.scorePair(mystry, guess)
+                    totals[guess] += value
+                    squares[guess] += value * value
+                counts[guess] = stop
+                if time.monotonic() >= deadline:
+                    break
+            bounds = {guess: self.confidenceInterval(totals[guess], squares[guess], counts[guess], len(sample)) for guess in guesses}
+            lower_bounds = sorted((low for low, high in bounds.values()), reverse=True)
+            threshold = lower_bounds[min(top_k, len(lower_bounds)) - 1]
+            contenders = [guess for guess in active if bounds[guess][1] >= threshold]
+            # everyone refined this round saw the same candidates, so
+            # their means compare fairly; keep the better half
+            contenders.sort(key=lambda guess: totals[guess] / counts[guess] if counts[guess] else -math.inf, reverse=True)
+            active = [
+                guess for guess in contenders[:max(top_k, len(contenders) // 2)]
+                if counts[guess] < limit
+            ]
+        bounds = {guess: self.confidenceInterval(totals[guess], squares[guess], counts[guess], len(sample)) for guess in guesses}
+        # scores are never negative, so neither is a useful lower bound
+        return [(guess, max(bounds[guess][0], 0.0)) for guess in guesses]
+
+    @staticmethod
+    def confidenceInterval(total: float, squares: float, count: int, population: int) -> Tuple[float, float]:
+        if count >= population:
+            return total / count, total / count
+        if count < 2:
+            return -math.inf, math.inf
+        mean = total / count
+        variance = max(squares / count - mean * mean, 0.0) * count / (count - 1)
+        # finite population correction, the sample is drawn without replacement
+        width = 1.96 * math.sqrt(variance / count * (population - count) / (population - 1))
+        return mean - width, mean + width
+
     def changeColor(self, turn, index) -> CharMode:
         if self.phase != TurnPhase.color_entry:
             return None
@@ -276,32 +543,149 @@ class GameModel:
         sorted_recs = self.recommendations[:]
         sorted_recs.sort(reverse=True, key=lambda x: x.score)
         self.sorted_score = list(map(lambda x: x.word, sorted_recs))
+        self.negated_scores = list(map(lambda x: -x.score, sorted_recs))
         self.sorted_alpha = self.sorted_score[:]
         self.sorted_alpha.sort()
 
-    def generateCandidates(self) -> None:
-        self.constraints &= self.constraint_class.fromWordAndCharModes(
-            self.words[self.turn_number],
-            self.colors[self.turn_number]
-        )
-
-        candidates = list(filter(self.constraints.match, self.allowed_word_list))
+    def narrowCandidates(self, word: str, modes: List[CharMode]) -> Tuple[ConstraintAbstract, List[str]]:
+        constraints = self.constraints & self.constraint_class.fromWordAndCharModes(word, modes)
+        return constraints, list(filter(constraints.match, self.allowed_word_list))
 
+    def scoreCandidates(self, candidates: List[str], use_pool: bool, cancel: threading.Event = None) -> List[Tuple[str, float]]:
+        if not candidates:
+            return []
         calc_function = self.getScoreForGuess
         params_list = map(lambda guess: (guess, candidates), candidates)
-        if self.use_pool:
-            with Pool() as p:
-                score_pairs = list(p.imap_unordered(calc_function, params_list))
+        if len(candidates) > self.exact_score_limit:
+            score_pairs = self.estimateScores(candidates, candidates, self.time_budget, seed=self.seed, cancel=cancel, max_samples=self.max_samples)
+        elif use_pool:
+            positions = {word: i for i, word in enumerate(self.allowed_word_list)}
+            indexes = list(map(positions.__getitem__, candidates))
+            # workers attach to the candidates once, tasks are just ranges
+            chunk = max(1, len(candidates) // (4 * (os.cpu_count() or 1)))
+            ranges = list(map(lambda start: (start, min(start + chunk, len(candidates))), range(0, len(candidates), chunk)))
+            with SharedWordTable(self.allowed_word_list, indexes) as table:
+                initargs = (table.words_block.name, table.index_block.name, table.index_count, self.constraint_class, self.class_scores)
+                with Pool(initializer=attachWorker, initargs=initargs) as p:
+                    score_pairs = [pair for pairs in p.imap_unordered(scoreRange, ranges) for pair in pairs]
         else:
             score_pairs = []
             for params in params_list:
+                if cancel is not None and cancel.is_set():
+                    break
                 score_pairs.append(calc_function(params))
 
-
         score_pairs.sort(key=lambda x: x[1], reverse=True)
+        return score_pairs
+
+    def generateCandidates(self) -> None:
+        word = self.words[self.turn_number]
+        modes = self.colors[self.turn_number]
+        self.stopSpeculation()
+        pattern = "".join(map(lambda pair: pair[0].value + pair[1], zip(modes, word)))
+        if pattern in self.speculations:
+            self.constraints, candidates, score_pairs = self.speculations[pattern]
+        else:
+            self.constraints, candidates = self.narrowCandidates(word, modes)
+            score_pairs = self.scoreCandidates(candidates, self.use_pool)
+        self.speculations = {}
+        self.candidates = candidates
+        self.evaluations = {}
 
         self.recommendations = list(map(lambda pair: Candidate(pair[0], pair[1]), score_pairs))
 
+    def startSpeculation(self, word: str) -> None:
+        """
+        while the user is still entering colors, work out the next
+        recommendations for the most likely feedback patterns of word,
+        biggest bucket first. patterns already worked out are kept while
+        they are still among the speculation_limit most likely.
+        """
+        self.stopSpeculation()
+        cancel = threading.Event()
+        candidates = self.getCandidates()
+
+        def speculate():
+            patterns = Counter(map(lambda mystry: self.constraint_class.feedback(mystry, word), candidates))
+            top = list(map(lambda common: common[0], patterns.most_common(self.speculation_limit)))
+            for pattern in list(filter(lambda pattern: pattern not in top, self.speculations)):
+                del self.speculations[pattern]
+            for pattern in top:
+                if pattern in self.speculations:
+                    continue
+                modes = list(map(lambda pos: CharMode(pattern[pos]), range(0, 10, 2)))
+                constraints, narrowed = self.narrowCandidates(word, modes)
+                score_pairs = self.scoreCandidates(narrowed, False, cancel)
+                if cancel.is_set():
+                    return
+                self.speculations[pattern] = (constraints, narrowed, score_pairs)
+
+        thread = threading.Thread(target=speculate, daemon=True)
+        self.speculation = (thread, cancel)
+        thread.start()
+
+    def stopSpeculation(self, cancel: bool = True) -> None:
+        if self.speculation is None:
+            return
+        thread, cancel_event = self.speculation
+        if cancel:
+            cancel_event.set()
+        thread.join()
+        self.speculation = None
+
+    def updateDictionary(self, added=(), removed=()) -> int:
+        """
+        apply a dictionary delta without rescoring from scratch. each
+        recommendation's average gains or loses one term per changed
+        candidate, new candidates get scored on their own, and only
+        the cached evaluations and speculations the change touches are
+        dropped. speculation during color entry picks up where it left
+        off. returns the new dictionary version.
+        """
+        # reject bad words before touching any state, speculation included
+        added = list(map(str.lower, added))
+        WordDictionary.checkWords(added)
+        self.stopSpeculation()
+        added, removed = self.dictionary.apply(added, removed)
+        if self.candidates is not None:
+            self.applyCandidateDelta(added, removed)
+        if self.speculate and self.phase == TurnPhase.color_entry:
+            self.startSpeculation(self.words[-1])
+        return self.dictionary.version
+
+    def applyCandidateDelta(self, added: List[str], removed: List[str]) -> None:
+        candidate_set = set(self.candidates)
+        removed = list(filter(candidate_set.__contains__, removed))
+        gone = set(removed)
+        for pattern, (constraints, narrowed, score_pairs) in list(self.speculations.items()):
+            if any(map(constraints.match, added)) or gone.intersection(narrowed):
+                del self.speculations[pattern]
+        added = list(filter(self.constraints.match, added))
+        if not added and not removed:
+            return
+
+        scored = len(self.recommendations) == len(self.candidates)
+        old_count = len(self.candidates)
+        self.candidates = list(filter(lambda word: word not in gone, self.candidates)) + added
+        self.evaluations = {}
+        if not scored:
+            return
+
+        new_count = len(self.candidates)
+        recommendations = []
+        for rec in self.recommendations:
+            if rec.word in gone:
+                continue
+            total = rec.score * old_count
+            total -= sum(map(lambda mystry: self.scorePair(mystry, rec.word), removed))
+            total += sum(map(lambda mystry: self.scorePair(mystry, rec.word), added))
+            recommendations.append(Candidate(rec.word, total / new_count))
+        for word in added:
+            recommendations.append(Candidate(*self.getScoreForGuess((word, self.candidates))))
+        recommendations.sort(key=lambda x: x.score, reverse=True)
+        self.recommendations = recommendations
+        self.processCandidates()
+
     def processColors(self) -> GameStatus:
         self.generateCandidates()
         self.processCandidates()
@@ -321,12 +705,59 @@ class GameModel:
         self.words.append(word.lower())
         self.phase = TurnPhase.color_entry
         self.colors.append([CharMode.absent]*5)
+        if self.speculate:
+            self.startSpeculation(self.words[-1])
 
         return self.words[-1]
 
+    def getCandidates(self) -> List[str]:
+        if self.candidates is None:
+            self.candidates = list(filter(self.constraints.match, self.allowed_word_list))
+        return self.candidates
+
+    def evaluateGuess(self, word: str) -> Optional[GuessEvaluation]:
+        """
+        what-if score for any word, candidate or not, against this
+        turn's candidates. each feedback bucket is scored once and the
+        result is cached until the candidates change. returns None for
+        anything that isn't a five letter word.
+        """
+        word = word.lower()
+        if not WordDictionary.isWord(word):
+            return None
+        if word in self.evaluations:
+            return self.evaluations[word]
+        candidates = self.getCandidates()
+        buckets = Counter()
+        bucket_scores = {}
+        total = 0
+        for mystry in candidates:
+            pattern = self.constraint_class.feedback(mystry, word)
+            buckets[pattern] += 1
+            if pattern not in bucket_scores:
+                bucket_scores[pattern] = self.scorePair(mystry, word)
+            total += bucket_scores[pattern]
+        score = total / len(candidates) if candidates else 0.0
+        rank = bisect_left(self.negated_scores, -score) + 1
+        evaluation = GuessEvaluation(word, score, dict(buckets), rank)
+        self.evaluations[word] = evaluation
+        return evaluation
+
     def getRecommendations(self, sortByScore=True):
         if sortByScore:
             return self.sorted_score
         return self.sorted_alpha
 
 
+_worker_model = None
+_worker_candidates = None
+
+def attachWorker(words_name: str, index_name: str, index_count: int, constraint_class: type, class_scores: Dict[str, float]) -> None:
+    global _worker_model, _worker_candidates
+    _worker_candidates = SharedWordTable.attach(words_name, index_name, index_count)
+    _worker_model = GameModel(word_list=[], favorites_list=[], constraint_class=constraint_class, use_pool=False, speculate=False)
+    _worker_model.class_scores = class_scores
+
+def scoreRange(bounds: Tuple[int, int]) -> List[Tuple[str, float]]:
+    start, stop = bounds
+    return list(map(lambda guess: _worker_model.getScoreForGuess((guess, _worker_candidates)), _worker_candidates[start:stop]))
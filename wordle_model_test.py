@@ -1,9 +1,11 @@
 #!python3
 
 from abc import abstractmethod
+import math
 import unittest
 from unittest.mock import Mock
-from wordle_model import GameModel, CharMode, ConstraintAbstract
+from multiprocessing.shared_memory import SharedMemory
+from wordle_model import GameModel, CharMode, Constraint, ConstraintAbstract, SharedWordTable
 from typing import List
 
 class ConstraintMock(ConstraintAbstract):
@@ -22,6 +24,10 @@ class ConstraintMock(ConstraintAbstract):
     @staticmethod
     def diff(mystery, guess):
         return ConstraintMock()
+
+    @staticmethod
+    def feedback(mystery, guess):
+        return "".join(map(lambda ltr: CharMode.absent.value + ltr, mystery))
     
     def score(self):
         return 10.0
@@ -117,6 +123,215 @@ class testWordleModel(unittest.TestCase):
         recs = model.getRecommendations(False)
         self.assertEqual(0, len(recs))
         
+    def test_estimated_scores_match_exact_scores_given_enough_time(self):
+        words = ["brand", "adieu", "candy", "crane", "sooty", "silly", "booty", "brine"]
+        model = GameModel(word_list=words, favorites_list=[], use_pool=False)
+        exact = dict(map(model.getScoreForGuess, map(lambda guess: (guess, words), words)))
+        estimated = model.estimateScores(words, words, time_budget=10.0, top_k=len(words), seed=1)
+        for guess, score in estimated:
+            self.assertAlmostEqual(score, exact[guess])
+
+    def test_estimated_top_guesses_are_near_the_exact_top(self):
+        model = GameModel(favorites_list=[], use_pool=False, speculate=False)
+        constraints, candidates = model.narrowCandidates("crane", [CharMode.absent] * 5)
+        self.assertGreater(len(candidates), model.exact_score_limit // 2)
+        exact = dict(map(model.getScoreForGuess, map(lambda guess: (guess, candidates), candidates)))
+        exact_order = sorted(exact, key=exact.get, reverse=True)
+        for seed in range(5):
+            estimated = model.estimateScores(candidates, candidates, time_budget=math.inf, seed=seed)
+            estimated.sort(key=lambda pair: pair[1], reverse=True)
+            for guess, score in estimated[:3]:
+                self.assertIn(guess, exact_order[:10])
+            self.assertLessEqual(estimated[0][1], exact[exact_order[0]] + 1e-9)
+
+    def test_estimated_scores_are_repeatable(self):
+        words = ["brand", "adieu", "candy", "crane", "sooty", "silly", "booty", "brine"]
+        model = GameModel(word_list=words, favorites_list=[], use_pool=False, speculate=False)
+        first = model.estimateScores(words, words, time_budget=math.inf, top_k=2, batch_size=2, seed=model.seed)
+        second = model.estimateScores(words, words, time_budget=math.inf, top_k=2, batch_size=2, seed=model.seed)
+        self.assertEqual(first, second)
+
+    def test_estimated_scores_stop_at_time_budget(self):
+        model = self.create_model()
+        estimated = model.estimateScores(word_list, word_list, time_budget=0.0)
+        self.assertEqual(list(map(lambda pair: pair[0], estimated)), word_list)
+
+    def test_large_candidate_sets_use_estimated_scores(self):
+        model = GameModel(word_list=word_list, favorites_list=[], constraint_class=ConstraintMock, constraint=ConstraintMock(), use_pool=False, exact_score_limit=1, speculate=False)
+        model.estimateScores = Mock(return_value=[("candy", 1.0)])
+        model.addWord("word1")
+        model.processColors()
+        model.estimateScores.assert_called_once()
+        self.assertEqual(model.getRecommendations(), ["candy"])
+
+    def test_evaluate_guess_matches_full_score(self):
+        words = ["brand", "adieu", "candy", "crane", "sooty", "silly", "booty", "brine"]
+        model = GameModel(word_list=words, favorites_list=[], use_pool=False)
+        model.addWord("sooty")
+        model.processColors()
+        candidates = model.getCandidates()
+        for word in ["crane", "zzzzz"]:
+            evaluation = model.evaluateGuess(word)
+            self.assertAlmostEqual(evaluation.score, model.getScoreForGuess((word, candidates))[1])
+            self.assertEqual(sum(evaluation.buckets.values()), len(candidates))
+
+    def test_evaluate_guess_ranks_against_recommendations(self):
+        model = self.create_model()
+        model.addWord("word1")
+        model.processColors()
+        evaluation = model.evaluateGuess("zzzzz")
+        self.assertEqual(evaluation.score, 10.0)
+        self.assertEqual(evaluation.rank, 1)
+        self.assertEqual(len(evaluation.buckets), len(word_list))
+        self.assertIs(model.evaluateGuess("ZZZZZ"), evaluation)
+
+    def test_evaluate_guess_rejects_non_words(self):
+        model = self.create_model()
+        for word in ["", "abc", "toolong", "ab1de", "héllo"]:
+            self.assertIsNone(model.evaluateGuess(word))
+        self.assertEqual(model.evaluations, {})
+
+    def test_speculated_pattern_gives_same_recommendations(self):
+        words = ["brand", "adieu", "candy", "crane", "sooty", "silly", "booty", "brine"]
+        expected = GameModel(word_list=words, favorites_list=[], use_pool=False, speculate=False)
+        model = GameModel(word_list=words, favorites_list=[], use_pool=False)
+        for game in [expected, model]:
+            game.addWord("crane")
+        model.stopSpeculation(cancel=False)
+        self.assertIn("_c_r_a_n_e", model.speculations)
+        model.narrowCandidates = Mock(side_effect=AssertionError("speculated pattern was recomputed"))
+        expected.processColors()
+        model.processColors()
+        self.assertEqual(model.getRecommendations(), expected.getRecommendations())
+        self.assertEqual(model.getCandidates(), expected.getCandidates())
+        self.assertEqual(model.speculations, {})
+
+    def test_confirm_cancels_speculation(self):
+        model = GameModel(word_list=word_list, favorites_list=[], constraint_class=ConstraintMock, constraint=ConstraintMock(), use_pool=False)
+        model.addWord("word1")
+        thread, cancel = model.speculation
+        model.processColors()
+        self.assertTrue(cancel.is_set())
+        self.assertFalse(thread.is_alive())
+        self.assertIsNone(model.speculation)
+
+    def test_score_pair_reuses_score_classes(self):
+        words = ["brand", "adieu", "candy", "crane", "sooty", "silly", "booty", "brine"]
+        model = GameModel(word_list=words, favorites_list=[], use_pool=False)
+        for guess in words:
+            for mystry in words:
+                expected = 0.0 if guess == mystry else Constraint.diff(mystry, guess).score()
+                self.assertEqual(model.scorePair(mystry, guess), expected)
+        self.assertLess(len(model.class_scores), len(words) * (len(words) - 1))
+
+    def test_dictionary_delta_matches_full_rescore(self):
+        words = ["brand", "adieu", "candy", "crane", "sooty", "silly", "booty", "brine"]
+        model = GameModel(word_list=words, favorites_list=[], use_pool=False, speculate=False)
+        model.addWord("crane")
+        model.processColors()
+        version = model.updateDictionary(added=["tooth", "zzzzz"], removed=["booty", "adieu"])
+        self.assertEqual(version, 1)
+        self.assertEqual(model.dictionary.deltas, [(1, ["tooth", "zzzzz"], ["booty", "adieu"])])
+
+        updated = ["brand", "candy", "crane", "sooty", "silly", "brine", "tooth", "zzzzz"]
+        expected = GameModel(word_list=updated, favorites_list=[], use_pool=False, speculate=False)
+        expected.addWord("crane")
+        expected.processColors()
+        self.assertEqual(sorted(model.getCandidates()), sorted(expected.getCandidates()))
+        self.assertEqual(model.getRecommendations(), expected.getRecommendations())
+        scores = dict(map(lambda rec: (rec.word, rec.score), expected.recommendations))
+        for rec in model.recommendations:
+            self.assertAlmostEqual(rec.score, scores[rec.word])
+
+    def test_dictionary_rejects_words_that_are_not_five_letters(self):
+        words = ["brand", "adieu", "candy", "crane", "sooty", "silly", "booty", "brine"]
+        model = GameModel(word_list=words, favorites_list=[], use_pool=False, speculate=False)
+        model.addWord("crane")
+        model.processColors()
+        candidates = model.getCandidates()
+        for bad in [["toolong"], ["abc"], ["dolly", "ab1de"]]:
+            self.assertRaises(ValueError, model.updateDictionary, added=bad, removed=["brand"])
+        self.assertEqual(model.dictionary.version, 0)
+        self.assertEqual(model.allowed_word_list, words)
+        self.assertEqual(model.getCandidates(), candidates)
+        self.assertRaises(ValueError, GameModel, word_list=["brand", "toolong"], favorites_list=[])
+
+    def test_dictionary_delta_keeps_unaffected_caches(self):
+        words = ["brand", "adieu", "candy", "crane", "sooty", "silly", "booty", "brine"]
+        model = GameModel(word_list=words, favorites_list=[], use_pool=False)
+        model.addWord("crane")
+        model.stopSpeculation(cancel=False)
+        evaluation = model.evaluateGuess("sooty")
+        speculations = dict(model.speculations)
+        self.assertIn("_c_r_a_n_e", speculations)
+        self.assertEqual(model.updateDictionary(added=["brand"], removed=["zzzzz"]), 0)
+        self.assertIs(model.evaluateGuess("sooty"), evaluation)
+        model.updateDictionary(added=["dolly"])
+        self.assertIsNot(model.evaluateGuess("sooty"), evaluation)
+
+        # speculation resumes, redoing only the pattern dolly falls into
+        model.stopSpeculation(cancel=False)
+        self.assertEqual(set(model.speculations), set(speculations))
+        for pattern, speculation in speculations.items():
+            if pattern != "_c_r_a_n_e":
+                self.assertIs(model.speculations[pattern], speculation)
+        self.assertIn("dolly", model.speculations["_c_r_a_n_e"][1])
+
+    def test_restarted_speculation_stays_within_limit(self):
+        words = ["brand", "adieu", "candy", "crane", "sooty", "silly", "booty", "brine"]
+        model = GameModel(word_list=words, favorites_list=[], use_pool=False, speculation_limit=2)
+        model.addWord("crane")
+        model.stopSpeculation(cancel=False)
+        self.assertEqual(len(model.speculations), 2)
+        model.updateDictionary(added=["cloth", "cubit", "chump", "civic"])
+        model.stopSpeculation(cancel=False)
+        self.assertEqual(len(model.speculations), 2)
+        self.assertIn("+c_r_a_n_e", model.speculations)
+
+    def test_shared_word_table_round_trips_and_unlinks(self):
+        words = ["brand", "adieu", "candy", "crane"]
+        with SharedWordTable(words, [3, 0, 3]) as table:
+            names = [table.words_block.name, table.index_block.name]
+            self.assertEqual(SharedWordTable.attach(names[0], names[1], table.index_count), ["crane", "brand", "crane"])
+        for name in names:
+            self.assertRaises(FileNotFoundError, SharedMemory, name=name)
+
+    def test_shared_word_table_handles_no_indexes(self):
+        with SharedWordTable(["brand"], []) as table:
+            self.assertEqual(SharedWordTable.attach(table.words_block.name, table.index_block.name, 0), [])
+
+    def test_pool_scoring_with_no_candidates(self):
+        model = GameModel(favorites_list=[], speculate=False)
+        self.assertTrue(model.use_pool)
+        model.addWord("crane")
+        model.colors[0] = [CharMode.correct] * 4 + [CharMode.present]
+        model.processColors()
+        self.assertEqual(model.getCandidates(), [])
+        self.assertEqual(model.getRecommendations(), [])
+        self.assertEqual(model.scoreCandidates([], True), [])
+
+    def test_shared_word_table_attach_closes_blocks_on_failure(self):
+        with SharedWordTable(["brand"], [0]) as table:
+            opened = []
+            real = SharedMemory
+            def tracking(*args, **kwargs):
+                block = real(*args, **kwargs)
+                opened.append(block)
+                return block
+            with unittest.mock.patch("wordle_model.SharedMemory", side_effect=tracking):
+                self.assertRaises(FileNotFoundError, SharedWordTable.attach, table.words_block.name, "wordle_missing_block", 1)
+            self.assertEqual(len(opened), 1)
+            self.assertIsNone(opened[0].buf)
+
+    def test_pool_scoring_matches_in_process_scoring(self):
+        words = ["brand", "adieu", "candy", "crane", "sooty", "silly", "booty", "brine"]
+        models = [GameModel(word_list=words, favorites_list=[], use_pool=use_pool, speculate=False) for use_pool in [False, True]]
+        for model in models:
+            model.addWord("brine")
+            model.processColors()
+        expected, pooled = map(lambda model: dict(map(lambda rec: (rec.word, rec.score), model.recommendations)), models)
+        self.assertEqual(pooled, expected)
+
 
 if __name__ == "__main__":
     unittest.main()
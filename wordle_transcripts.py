@@ -0,0 +1,154 @@
+#!python3
+
+from __future__ import annotations
+
+import argparse
+import fileinput
+import math
+from functools import lru_cache
+from itertools import islice
+from multiprocessing import Pool
+import sys
+from typing import Iterable, Iterator, List, Tuple
+
+from wordle_model import CharMode, ConstraintAbstract, GameModel
+
+# Replays recorded games written in clue notation, one game per line:
+#
+#   game42 _a_d-i_e_u +s_o_o_t+y
+#
+# The leading game id is optional, games without one are named after their
+# line number. Blank lines and lines starting with # are skipped. For every
+# step this prints the game id, step number, clue string, how many
+# candidates survive, the solver's next guess and the candidates themselves.
+# Steps with more than --exact-score-limit candidates are estimated from a
+# fixed-size, fixed-seed sample rather than against the clock, so the same
+# transcript always gives the same output.
+#
+#   ./wordle_transcripts.py games.txt more_games.txt
+#   zcat games.txt.gz | ./wordle_transcripts.py --processes 8
+
+_word_list = None
+_exact_score_limit = None
+_max_samples = None
+_seed = None
+_class_scores = {}
+
+
+def initReplay(word_list: List[str], exact_score_limit: int = 300, max_samples: int = 256, seed: int = 0) -> None:
+    global _word_list, _exact_score_limit, _max_samples, _seed, _class_scores
+    _word_list = word_list
+    _exact_score_limit = exact_score_limit
+    _max_samples = max_samples
+    _seed = seed
+    _class_scores = {}
+    replayPrefix.cache_clear()
+
+
+def isClue(token: str) -> bool:
+    if len(token) != 10:
+        return False
+    modes = set(map(lambda mode: mode.value, [CharMode.absent, CharMode.present, CharMode.correct]))
+    return all(map(lambda pos: token[pos] in modes and token[pos + 1].isalpha(), range(0, 10, 2)))
+
+
+def readGames(lines: Iterable[str]) -> Iterator[Tuple[str, Tuple[str, ...]]]:
+    """
+    lazily turn transcript lines into (game id, clue strings) pairs.
+    malformed lines are reported on stderr and skipped.
+    """
+    for line_number, line in enumerate(lines, 1):
+        tokens = line.split()
+        if not tokens or tokens[0].startswith("#"):
+            continue
+        game_id = str(line_number)
+        if not isClue(tokens[0]):
+            game_id, tokens = tokens[0], tokens[1:]
+        clues = tuple(map(str.lower, tokens))
+        if not clues:
+            print(f"line {line_number}: skipping game {game_id}, no clue strings", file=sys.stderr)
+            continue
+        bad = list(filter(lambda token: not isClue(token), clues))
+        if bad:
+            print(f"line {line_number}: skipping game {game_id}, bad clue string {bad[0]!r}", file=sys.stderr)
+            continue
+        yield game_id, clues
+
+
+@lru_cache(maxsize=4096)
+def replayPrefix(clues: Tuple[str, ...]) -> Tuple[ConstraintAbstract, List[str], str]:
+    """
+    (constraints, surviving candidates, next guess) after clues. games
+    that open the same way share the cached steps.
+    """
+    constraint = replayPrefix(clues[:-1])[0] if len(clues) > 1 else None
+    model = GameModel(
+        word_list=_word_list,
+        favorites_list=[],
+        constraint=constraint,
+        use_pool=False,
+        exact_score_limit=_exact_score_limit,
+        time_budget=math.inf,
+        seed=_seed,
+        max_samples=_max_samples,
+        speculate=False,
+    )
+    model.class_scores = _class_scores
+    clue = clues[-1]
+    model.addWord("".join(map(clue.__getitem__, range(1, 10, 2))))
+    model.colors[-1] = list(map(lambda pos: CharMode(clue[pos]), range(0, 10, 2)))
+    model.processColors()
+    recommendations = model.getRecommendations()
+    return model.constraints, model.getCandidates(), recommendations[0] if recommendations else None
+
+
+def replayGame(game: Tuple[str, Tuple[str, ...]]) -> Tuple[str, List[Tuple[str, List[str], str]]]:
+    game_id, clues = game
+    steps = []
+    for step in range(1, len(clues) + 1):
+        constraints, candidates, recommendation = replayPrefix(clues[:step])
+        steps.append((clues[step - 1], candidates, recommendation))
+    return game_id, steps
+
+
+def replayTranscripts(lines: Iterable[str], word_list: List[str], processes: int = None, batch_size: int = 1000, exact_score_limit: int = 300, max_samples: int = 256, seed: int = 0) -> Iterator[Tuple[str, List[Tuple[str, List[str], str]]]]:
+    """
+    replay games from lines in order, batch_size games at a time so
+    memory stays bounded however long the input is. processes=0 replays
+    in this process instead of a pool.
+    """
+    games = readGames(lines)
+    if processes == 0:
+        initReplay(word_list, exact_score_limit, max_samples, seed)
+        yield from map(replayGame, games)
+        return
+    with Pool(processes, initializer=initReplay, initargs=(word_list, exact_score_limit, max_samples, seed)) as p:
+        while True:
+            batch = list(islice(games, batch_size))
+            if not batch:
+                break
+            yield from p.imap(replayGame, batch, chunksize=max(1, batch_size // (4 * (processes or 4))))
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Replay recorded wordle games written as clue strings.")
+    parser.add_argument("files", nargs="*", help="transcript files, stdin if none are given")
+    parser.add_argument("--processes", type=int, default=None, help="worker processes, 0 to replay in this process")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--exact-score-limit", type=int, default=300)
+    parser.add_argument("--max-samples", type=int, default=256, help="candidates sampled per guess above the exact score limit")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-candidates", type=int, default=None, help="only print this many candidates per step")
+    args = parser.parse_args(argv)
+
+    word_list = sorted(set(map(lambda x: x.strip().lower(), open("words.txt", "r"))))
+    with fileinput.input(files=args.files) as lines:
+        results = replayTranscripts(lines, word_list, args.processes, args.batch_size, args.exact_score_limit, args.max_samples, args.seed)
+        for game_id, steps in results:
+            for step, (clue, candidates, recommendation) in enumerate(steps, 1):
+                shown = candidates if args.max_candidates is None else candidates[:args.max_candidates]
+                print(f"{game_id}\t{step}\t{clue}\t{len(candidates)}\t{recommendation or '-'}\t{','.join(shown)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!python3
+
+from contextlib import redirect_stderr
+import io
+import unittest
+from wordle_model import CharMode, GameModel
+from wordle_transcripts import isClue, readGames, replayTranscripts
+
+word_list = ["brand", "adieu", "candy", "crane", "sooty", "silly", "booty", "brine"]
+
+transcript = [
+    "# recorded games\n",
+    "g1 _c_r_a_n_e _s+o+o+t+y +b+o+o+t+y\n",
+    "\n",
+    "_c_r_a_n_e +s_o_o_t+y\n",
+    "g3 _c_r_a_n_e xyz\n",
+]
+
+
+class testWordleTranscripts(unittest.TestCase):
+
+    def test_is_clue(self):
+        self.assertTrue(isClue("+s_a-s_s_y"))
+        self.assertFalse(isClue("+s_a-s_s"))
+        self.assertFalse(isClue("*s_a-s_s_y"))
+
+    def test_read_games_skips_comments_and_bad_lines(self):
+        games = list(readGames(transcript))
+        self.assertEqual(games, [
+            ("g1", ("_c_r_a_n_e", "_s+o+o+t+y", "+b+o+o+t+y")),
+            ("4", ("_c_r_a_n_e", "+s_o_o_t+y")),
+        ])
+
+    def test_read_games_reports_why_lines_are_skipped(self):
+        errors = io.StringIO()
+        with redirect_stderr(errors):
+            self.assertEqual(list(readGames(["bad\n", "g2 _c_r_a_n_e xyz\n"])), [])
+        self.assertEqual(errors.getvalue().splitlines(), [
+            "line 1: skipping game bad, no clue strings",
+            "line 2: skipping game g2, bad clue string 'xyz'",
+        ])
+
+    def test_replay_matches_playing_the_model(self):
+        model = GameModel(word_list=word_list, favorites_list=[], use_pool=False, speculate=False)
+        model.addWord("crane")
+        model.processColors()
+
+        results = list(replayTranscripts(transcript, word_list, processes=0))
+        self.assertEqual(list(map(lambda result: result[0], results)), ["g1", "4"])
+        clue, candidates, recommendation = results[0][1][0]
+        self.assertEqual(clue, "_c_r_a_n_e")
+        self.assertEqual(candidates, model.getCandidates())
+        self.assertEqual(recommendation, model.getRecommendations()[0])
+        self.assertEqual(results[0][1][1][1], ["booty"])
+        self.assertEqual(results[1][1][1][1], ["silly"])
+
+    def test_pool_replay_matches_in_process_replay(self):
+        expected = list(replayTranscripts(transcript * 5, word_list, processes=0))
+        results = list(replayTranscripts(transcript * 5, word_list, processes=2, batch_size=3))
+        self.assertEqual(results, expected)
+
+    def test_estimated_replay_is_deterministic(self):
+        # three candidates survive crane, more than the exact limit of two
+        options = dict(exact_score_limit=2, max_samples=2, seed=3)
+        expected = list(replayTranscripts(transcript * 5, word_list, processes=0, **options))
+        again = list(replayTranscripts(transcript * 5, word_list, processes=0, **options))
+        results = list(replayTranscripts(transcript * 5, word_list, processes=2, batch_size=3, **options))
+        self.assertEqual(again, expected)
+        self.assertEqual(results, expected)
+        self.assertIn(expected[0][1][0][2], ["sooty", "silly", "booty"])
+
+
+if __name__ == "__main__":
+    unittest.main()
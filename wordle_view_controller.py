@@ -54,6 +54,9 @@ class Gui:
         entry_label.grid(column=0, row=0)
         self.entry_input = Entry(self.entry_row, font=("Courier", 24, "normal"), width=5)
         self.entry_input.grid(column=1, row=0)
+        self.entry_input.bind("<KeyRelease>", lambda e: self.showWhatIf())
+        self.what_if_label = Label(puzzle_frame, text="")
+        self.what_if_label.grid(column=0, row=3, columnspan=3)
         board_frame = Frame(puzzle_frame)
         board_frame.grid(column=0, row=2, columnspan=3)
         row_pads = []
@@ -125,10 +128,12 @@ class Gui:
             text="Favorite Words")
         self.favorite_words_label.grid(column=0, row=0)
         list_start = 1
+        self.favorite_items = []
         for idx, word in enumerate(self.model.favorites):
             word_select_item = Label(self.word_list_frame, text=word, borderwidth=1, relief="raised")
             word_select_item.bind("<Button-1>", partial(self.word_select_item_click, text=word))
             word_select_item.grid(column=0, row=idx + list_start, ipadx = 5, ipady = 2, pady = 2)
+            self.favorite_items.append(word_select_item)
         list_start += len(self.model.favorites)
         spacer_label = Label(self.word_list_frame, width=self.word_select_width_chars, text="")
         spacer_label.grid(column=0, row=list_start)
@@ -188,6 +193,7 @@ class Gui:
         turn_result = self.model.processColors()
         # TODO: do something with turn_result - could show a fanfare or a sad face if the game is over
         self.entry_input.delete(0, END)
+        self.what_if_label.configure(text="")
         self.color_confirm.grid_forget()
         self.entry_placeholder.grid_forget()
         self.entry_row.grid(column=0, row=1)
@@ -207,10 +213,30 @@ class Gui:
             return
         self.entry_input.delete(0, END)
         self.entry_input.insert(0, text)
+        self.showWhatIf()
+
+    def showWhatIf(self):
+        evaluation = self.model.evaluateGuess(self.entry_input.get())
+        if evaluation is None:
+            self.what_if_label.configure(text="")
+            return
+        largest = max(evaluation.buckets.values(), default=0)
+        self.what_if_label.configure(
+            text=f"score {evaluation.score:.3f}, rank {evaluation.rank}, "
+            f"{len(evaluation.buckets)} patterns, largest {largest}"
+        )
+
+    def populateFavoriteScores(self):
+        for word, label in zip(self.model.favorites, self.favorite_items):
+            evaluation = self.model.evaluateGuess(word)
+            if evaluation is None:
+                continue
+            label.configure(text=f"{word} {evaluation.score:.2f}")
 
     def populateWordRecommendations(self, sort_alpha=False):
         if self.word_select_items is None:
             self.word_select_items = []
+        self.populateFavoriteScores()
         recommendations_list = self.model.getRecommendations(sortByScore = not sort_alpha)
         last_word_label = None
         for idx, word in enumerate(recommendations_list):